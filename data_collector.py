@@ -3,20 +3,31 @@
 # ==============================================================================
 
 import re
-import time
+import csv
+import json
 import logging
 import os
-from io import BytesIO
+import html
+import tempfile
+import multiprocessing
+from functools import lru_cache
+from io import StringIO
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
 
-import pdfplumber
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 import psycopg2
 import urllib3
+from urllib3.util.retry import Retry
+
+try:
+    import pymupdf                 # moteur C MuPDF : texte + tables bien plus rapides
+    PYMUPDF_OK = True
+except ImportError:
+    PYMUPDF_OK = False
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s: %(message)s")
 
 # Configuration
 DB_NAME = os.environ.get("DB_NAME")
@@ -25,6 +36,69 @@ DB_PASSWORD = os.environ.get("DB_PASSWORD")
 DB_HOST = os.environ.get("DB_HOST")
 DB_PORT = os.environ.get("DB_PORT")
 
+# Cache de la page d'index des BOC (ETag / Last-Modified + liens extraits)
+BOC_INDEX_URL = "https://www.brvm.org/fr/bulletins-officiels-de-la-cote"
+BOC_INDEX_CACHE = os.environ.get(
+    "BOC_INDEX_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".boc_index_cache.json")
+)
+
+# Moteur d'extraction PDF : "pymupdf" (défaut, si installé) ou "pdfplumber"
+# pour forcer l'ancien moteur sans désinstaller PyMuPDF
+PDF_ENGINE = os.environ.get("BOC_PDF_ENGINE", "pymupdf").strip().lower()
+
+# Pages (index 0) portant le tableau des cotations dans un BOC : 2 à 4
+TABLE_PAGES = range(1, 4)
+
+# Nombre de BOC téléchargés en parallèle (attente réseau)
+PDF_WORKERS = 8
+# Nombre de BOC analysés en parallèle (pdfplumber, CPU) — un processus par cœur
+PARSE_WORKERS = os.cpu_count() or 1
+
+# Session HTTP partagée : connexions keep-alive vers brvm.org réutilisées
+# d'un BOC à l'autre (une seule négociation TLS par connexion du pool)
+_SESSION = requests.Session()
+_SESSION.verify = False
+_SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+})
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=PDF_WORKERS,
+    pool_maxsize=PDF_WORKERS,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504]),
+))
+
+# Regex compilées une seule fois (appelées pour chaque BOC / ligne de PDF)
+_RE_BOC_DATE = re.compile(r"boc_(\d{8})")
+# Chiffres : filtre des lignes de cotation sans passer par le moteur regex
+_DIGITS = frozenset("0123456789")
+# Nettoyage numérique en une passe C : suppression de tout blanc Unicode
+# (espaces insécables des PDF inclus), virgule décimale → point
+_NUM_TRANS = str.maketrans({
+    **{chr(c): None for c in range(0x3001) if chr(c).isspace()},
+    ",": ".",
+})
+# Liens BOC dans le HTML brut de la page d'index (sans construire de DOM) ;
+# attribut entre guillemets, apostrophes ou sans délimiteur (HTML valide aussi).
+# Mêmes liens que l'ancien filtre DOM : "boc_" sans casse, URL terminée
+# exactement par ".pdf" (pas de ".PDF" ni de "?v=2" tronqué)
+_RE_BOC_HREF = re.compile(rb"""(?i:href)\s*=\s*["']?\s*([^"'\s>]*(?i:boc_)[^"'\s>]*\.pdf)(?=["'\s>])""")
+
+# Indicateurs de marché (texte complet du BOC)
+_RE_BRVM_COMPOSITE = re.compile(r"BRVM\s+COMPOSITE\s+([\d\s,\.]+)", re.IGNORECASE)
+_RE_BRVM_30 = re.compile(r"BRVM\s+30\s+([\d\s,\.]+)", re.IGNORECASE)
+_RE_BRVM_PRESTIGE = re.compile(r"BRVM[\s\-]+PRESTIGE\s+([\d\s,\.]+)", re.IGNORECASE)
+_RE_CAPITALISATION = re.compile(
+    r"Capitalisation\s+boursière\s+\(FCFA\)\s*\(Actions\s*[&\+]?\s*Droits\)\s+([\d\s]+)",
+    re.IGNORECASE | re.DOTALL
+)
+_RE_CAPITALISATION_ALT = re.compile(
+    r"Actions\s+Niveau\s+Evol\.\s+Jour\s+Capitalisation\s+boursière[^\d]+([\d\s]+)",
+    re.IGNORECASE | re.DOTALL
+)
+_RE_VOLUME_MOYEN = re.compile(r"Volume\s+moyen\s+annuel\s+par\s+séance\s+([\d\s,\.]+)", re.IGNORECASE)
+_RE_VALEUR_MOYENNE = re.compile(r"Valeur\s+moyenne\s+annuelle\s+par\s+séance\s+([\d\s,\.]+)", re.IGNORECASE)
+
 
 def connect_to_db():
     """Connexion PostgreSQL"""
@@ -41,33 +115,77 @@ def connect_to_db():
 
 
 def get_company_ids(cur):
-    """Récupération des IDs sociétés"""
+    """Récupération des IDs sociétés (symboles normalisés une fois : strip + majuscules)"""
     try:
         cur.execute("SELECT symbol, id FROM companies;")
-        return {row[0]: row[1] for row in cur.fetchall()}
+        return {row[0].strip().upper(): row[1] for row in cur.fetchall() if row[0]}
     except Exception as e:
         logging.error(f"❌ Erreur récupération IDs: {e}")
         return {}
 
 
+@lru_cache(maxsize=4096)
 def extract_date_from_url(url):
-    """Extraction date depuis URL"""
-    date_match = re.search(r"boc_(\d{8})", url)
+    """Extraction date depuis URL (mémoïsée : appelée au tri puis à la sélection)"""
+    date_match = _RE_BOC_DATE.search(url)
     return date_match.group(1) if date_match else None
 
 
+def _load_index_cache():
+    """Lecture du cache de la page d'index (dict vide si absent/illisible)"""
+    try:
+        with open(BOC_INDEX_CACHE, encoding="utf-8") as f:
+            cache = json.load(f)
+        return cache if isinstance(cache.get("links"), list) else {}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def _save_index_cache(response, links):
+    """Écriture atomique du cache (fichier temporaire + os.replace)"""
+    cache = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "links": links,
+    }
+    if not cache["etag"] and not cache["last_modified"]:
+        return
+    tmp_path = BOC_INDEX_CACHE + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, BOC_INDEX_CACHE)
+    except OSError as e:
+        logging.warning(f"⚠️ Cache index BOC non écrit: {e}")
+
+
 def get_all_boc_links():
-    """Récupération des liens BOC"""
-    url = "https://www.brvm.org/fr/bulletins-officiels-de-la-cote"
+    """Récupération des liens BOC (requête conditionnelle si index en cache)"""
+    url = BOC_INDEX_URL
     logging.info(f"🔍 Recherche BOCs sur : {url}")
     
     try:
-        r = requests.get(url, verify=False, timeout=30)
-        soup = BeautifulSoup(r.content, "html.parser")
+        cache = _load_index_cache()
+        headers = {}
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+        if cache.get("last_modified"):
+            headers["If-Modified-Since"] = cache["last_modified"]
+        
+        r = _SESSION.get(url, headers=headers, timeout=30)
+        if r.status_code == 304:
+            logging.info(f"✅ Index inchangé (304) : {len(cache['links'])} BOC(s) en cache")
+            return cache["links"]
+        
         links = set()
+        hrefs = [html.unescape(m.decode("utf-8", "replace")) for m in _RE_BOC_HREF.findall(r.content)]
+        if not hrefs:
+            # Repli DOM si le balisage ne correspond plus au scan regex
+            from bs4 import BeautifulSoup   # import différé : chemin rare
+            soup = BeautifulSoup(r.content, "lxml")
+            hrefs = [a["href"].strip() for a in soup.find_all("a", href=True)]
         
-        for a in soup.find_all("a", href=True):
-            href = a["href"].strip()
+        for href in hrefs:
             if "boc_" in href.lower() and href.endswith(".pdf"):
                 full_url = href if href.startswith("http") else "https://www.brvm.org" + href
                 links.add(full_url)
@@ -76,23 +194,28 @@ def get_all_boc_links():
             logging.warning("⚠️ Aucun BOC trouvé")
             return []
         
-        sorted_links = sorted(list(links), key=lambda x: extract_date_from_url(x) or "19000101")
+        sorted_links = sorted(links, key=lambda x: extract_date_from_url(x) or "19000101")
         logging.info(f"✅ {len(sorted_links)} BOC(s) trouvé(s)")
+        if r.status_code == 200:
+            _save_index_cache(r, sorted_links)
         return sorted_links
     except Exception as e:
         logging.error(f"❌ Erreur récupération BOCs: {e}")
         return []
 
 
-def date_exists_in_db(conn, trade_date):
-    """Vérification date dans DB"""
+def get_existing_dates(conn, trade_dates):
+    """Parmi trade_dates, celles déjà présentes dans historical_data (une seule requête)"""
     try:
         with conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM historical_data WHERE trade_date = %s LIMIT 1;", (trade_date,))
-            return cur.fetchone() is not None
+            cur.execute(
+                "SELECT DISTINCT trade_date FROM historical_data WHERE trade_date = ANY(%s);",
+                (list(trade_dates),)
+            )
+            return {row[0] for row in cur.fetchall()}
     except Exception as e:
-        logging.error(f"❌ Erreur vérification date: {e}")
-        return False
+        logging.error(f"❌ Erreur vérification dates: {e}")
+        return set()
 
 
 def clean_and_convert_numeric(value):
@@ -100,12 +223,8 @@ def clean_and_convert_numeric(value):
     if value is None or value == "":
         return None
     
-    cleaned_value = str(value).strip()
-    cleaned_value = re.sub(r'\s+', '', cleaned_value)
-    cleaned_value = cleaned_value.replace(',', '.')
-    
     try:
-        return float(cleaned_value)
+        return float(str(value).translate(_NUM_TRANS))
     except (ValueError, TypeError):
         return None
 
@@ -149,42 +268,134 @@ def clean_capitalisation(raw_value):
     return val
 
 
-def extract_data_from_pdf(pdf_url):
-    """Extraction données depuis PDF"""
-    logging.info(f"   📄 Analyse du PDF...")
+def download_pdf(pdf_url, dest_dir):
+    """
+    Téléchargement d'un BOC (étape réseau seule), écrit par blocs dans dest_dir
+    sans copie intégrale en mémoire. Retourne le chemin du fichier, None en cas d'échec.
+    """
+    try:
+        with _SESSION.get(pdf_url, timeout=30, stream=True) as r:
+            r.raise_for_status()
+            fd, pdf_path = tempfile.mkstemp(suffix=".pdf", dir=dest_dir)
+            with os.fdopen(fd, "wb") as f:
+                for chunk in r.iter_content(chunk_size=1 << 16):
+                    f.write(chunk)
+        return pdf_path
+    except Exception as e:
+        logging.error(f"❌ Erreur téléchargement PDF: {e}")
+        return None
+
+
+def _is_table_page(page_index, page_text):
+    """
+    extract_tables / find_tables (détection des bords + regroupement) n'est
+    lancé que sur les pages de cotation dont la couche texte le confirme
+    """
+    return page_index in TABLE_PAGES and "volume" in page_text.lower()
+
+
+def _iter_pages_pymupdf(pdf_path):
+    """(texte, tables) page par page via PyMuPDF"""
+    with pymupdf.open(pdf_path) as doc:
+        for page_index, page in enumerate(doc):
+            # sort=True : ordre de lecture (haut→bas, gauche→droite) comme pdfplumber,
+            # et non l'ordre du flux de contenu, qui sépare libellés et valeurs
+            # quand le BOC les dessine colonne par colonne
+            page_text = page.get_text(sort=True) or ""
+            tables = []
+            if _is_table_page(page_index, page_text):
+                tables = [table.extract() for table in page.find_tables().tables]
+            yield page_text, tables
+
+
+def _iter_pages_pdfplumber(pdf_path):
+    """(texte, tables) page par page via pdfplumber"""
+    import pdfplumber   # import différé (pdfminer.six) : seulement sans PyMuPDF
+    with pdfplumber.open(pdf_path) as pdf:
+        for page_index, page in enumerate(pdf.pages):
+            page_text = page.extract_text() or ""
+            tables = []
+            if _is_table_page(page_index, page_text):
+                tables = page.extract_tables() or []
+            yield page_text, tables
+            # Libère les objets de mise en page (chars, edges…) de la page traitée :
+            # la mémoire reste bornée à une page, quel que soit le nombre de pages
+            page.flush_cache()
+
+
+def _extract_rows(iter_pages, pdf_path):
+    """Lignes de cotation + texte complet d'un PDF via le moteur iter_pages"""
     data = []
+    text_parts = []
+    for page_text, tables in iter_pages(pdf_path):
+        text_parts.append(page_text)
+        for table in tables:
+            for row in table:
+                row = [(cell.strip() if cell else "") for cell in row]
+                if len(row) < 8:
+                    continue
+                
+                vol = row[-8]
+                val = row[-7]
+                cours = row[-6] if len(row) >= 6 else ""
+                symbole = (row[1] if len(row) > 1 and row[1] and len(row[1]) <= 5 else row[0]).upper()
+                
+                if not (_DIGITS.isdisjoint(vol) and _DIGITS.isdisjoint(val)):
+                    data.append((symbole, cours, vol, val))
+    return data, "".join(text_parts)
+
+
+def parse_pdf_file(pdf_path, company_symbols=None):
+    """
+    Extraction données depuis un PDF déjà téléchargé sur disque (étape CPU).
+    Seul le chemin transite vers le processus d'analyse, pas le contenu.
+    Retourne (lignes de cotation, texte complet du BOC pour les indicateurs),
+    chaque ligne étant un tuple (symbole, cours, volume, valeur) de chaînes.
+    PyMuPDF est essayé en premier ; pdfplumber ne sert qu'en repli, si
+    PyMuPDF est absent, désactivé (BOC_PDF_ENGINE=pdfplumber) ou ne
+    reconnaît aucun tableau dans ce BOC.
+    Si company_symbols est fourni, les lignes hors cote sont écartées ensuite
+    (après le choix du moteur, qui porte sur le tableau brut).
+    """
+    logging.info(f"   📄 Analyse du PDF...")
     
     try:
-        r = requests.get(pdf_url, verify=False, timeout=30)
-        pdf_file = BytesIO(r.content)
-        
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables() or []
-                for table in tables:
-                    for row in table:
-                        row = [(cell.strip() if cell else "") for cell in row]
-                        if len(row) < 8:
-                            continue
-                        
-                        vol = row[-8]
-                        val = row[-7]
-                        cours = row[-6] if len(row) >= 6 else ""
-                        symbole = row[1] if len(row) > 1 and row[1] and len(row[1]) <= 5 else row[0]
-                        
-                        if re.search(r"\d", str(vol)) or re.search(r"\d", str(val)):
-                            data.append({
-                                "Symbole": symbole,
-                                "Cours": cours,
-                                "Volume": vol,
-                                "Valeur": val
-                            })
+        data, pdf_text = [], ""
+        if PYMUPDF_OK and PDF_ENGINE != "pdfplumber":
+            data, pdf_text = _extract_rows(_iter_pages_pymupdf, pdf_path)
+            if not data:
+                logging.info("   ℹ️ Aucun tableau via PyMuPDF — nouvel essai avec pdfplumber")
+        if not data:
+            data, pdf_text = _extract_rows(_iter_pages_pdfplumber, pdf_path)
+        if company_symbols is not None:
+            data = [row for row in data if row[0] in company_symbols]
         
         logging.info(f"   ✓ {len(data)} ligne(s) extraite(s)")
-        return data
+        return data, pdf_text
     except Exception as e:
         logging.error(f"❌ Erreur extraction PDF: {e}")
-        return []
+        return [], ""
+
+
+def _init_parse_worker(log_level):
+    """Initialisation d'un processus d'analyse : logs au même niveau que le parent"""
+    logging.basicConfig(level=log_level, format="%(asctime)s - %(levelname)s: %(message)s")
+
+
+def extract_data_from_pdf(pdf_url):
+    """
+    Extraction données depuis PDF (téléchargement + analyse).
+    Contrat historique conservé : liste de dicts Symbole/Cours/Volume/Valeur.
+    """
+    with tempfile.TemporaryDirectory(prefix="boc_") as tmp_dir:
+        pdf_path = download_pdf(pdf_url, tmp_dir)
+        if pdf_path is None:
+            return []
+        rows, _ = parse_pdf_file(pdf_path)
+    return [
+        {"Symbole": symbole, "Cours": cours, "Volume": vol, "Valeur": val}
+        for symbole, cours, vol, val in rows
+    ]
 
 
 def extract_market_indicators(pdf_text: str) -> dict:
@@ -194,30 +405,30 @@ def extract_market_indicators(pdf_text: str) -> dict:
     indicators = {}
     
     # 🔧 FIX 1: BRVM COMPOSITE (fonctionne déjà bien)
-    match = re.search(r"BRVM\s+COMPOSITE\s+([\d\s,\.]+)", pdf_text, re.IGNORECASE)
+    match = _RE_BRVM_COMPOSITE.search(pdf_text)
     if match:
         raw = match.group(1).strip()
-        indicators["brvm_composite"] = re.sub(r'\s+', '', raw).replace(',', '.')
+        indicators["brvm_composite"] = raw.translate(_NUM_TRANS)
         logging.info(f"   ✓ BRVM Composite trouvé: {indicators['brvm_composite']}")
     else:
         indicators["brvm_composite"] = None
         logging.warning("   ⚠️ BRVM Composite NON trouvé")
     
     # 🔧 FIX 2: BRVM 30 (fonctionne déjà bien)
-    match = re.search(r"BRVM\s+30\s+([\d\s,\.]+)", pdf_text, re.IGNORECASE)
+    match = _RE_BRVM_30.search(pdf_text)
     if match:
         raw = match.group(1).strip()
-        indicators["brvm_30"] = re.sub(r'\s+', '', raw).replace(',', '.')
+        indicators["brvm_30"] = raw.translate(_NUM_TRANS)
         logging.info(f"   ✓ BRVM 30 trouvé: {indicators['brvm_30']}")
     else:
         indicators["brvm_30"] = None
         logging.warning("   ⚠️ BRVM 30 NON trouvé")
     
     # 🔧 FIX 3: BRVM PRESTIGE (CORRECTION MAJEURE - avec espace OU tiret)
-    match = re.search(r"BRVM[\s\-]+PRESTIGE\s+([\d\s,\.]+)", pdf_text, re.IGNORECASE)
+    match = _RE_BRVM_PRESTIGE.search(pdf_text)
     if match:
         raw = match.group(1).strip()
-        indicators["brvm_prestige"] = re.sub(r'\s+', '', raw).replace(',', '.')
+        indicators["brvm_prestige"] = raw.translate(_NUM_TRANS)
         logging.info(f"   ✓ BRVM Prestige trouvé: {indicators['brvm_prestige']}")
     else:
         indicators["brvm_prestige"] = None
@@ -225,27 +436,19 @@ def extract_market_indicators(pdf_text: str) -> dict:
     
     # 🔧 FIX 4: CAPITALISATION GLOBALE (CORRECTION MAJEURE)
     # Recherche dans tableau "Actions" -> ligne "Capitalisation boursière"
-    match = re.search(
-        r"Capitalisation\s+boursière\s+\(FCFA\)\s*\(Actions\s*[&\+]?\s*Droits\)\s+([\d\s]+)",
-        pdf_text,
-        re.IGNORECASE | re.DOTALL
-    )
+    match = _RE_CAPITALISATION.search(pdf_text)
     if match:
         raw = match.group(1).strip()
         # Nettoyer TOUS les espaces
-        cleaned = re.sub(r'\s+', '', raw)
+        cleaned = raw.translate(_NUM_TRANS)
         indicators["capitalisation_globale"] = cleaned
         logging.info(f"   ✓ Capitalisation Globale trouvée: {indicators['capitalisation_globale']}")
     else:
         # Alternative: chercher juste après "Actions"
-        match_alt = re.search(
-            r"Actions\s+Niveau\s+Evol\.\s+Jour\s+Capitalisation\s+boursière[^\d]+([\d\s]+)",
-            pdf_text,
-            re.IGNORECASE | re.DOTALL
-        )
+        match_alt = _RE_CAPITALISATION_ALT.search(pdf_text)
         if match_alt:
             raw = match_alt.group(1).strip()
-            cleaned = re.sub(r'\s+', '', raw)
+            cleaned = raw.translate(_NUM_TRANS)
             indicators["capitalisation_globale"] = cleaned
             logging.info(f"   ✓ Capitalisation Globale trouvée (alt): {indicators['capitalisation_globale']}")
         else:
@@ -253,20 +456,20 @@ def extract_market_indicators(pdf_text: str) -> dict:
             logging.warning("   ⚠️ Capitalisation Globale NON trouvée")
     
     # 🔧 FIX 5: VOLUME MOYEN ANNUEL (fonctionne déjà bien)
-    match = re.search(r"Volume\s+moyen\s+annuel\s+par\s+séance\s+([\d\s,\.]+)", pdf_text, re.IGNORECASE)
+    match = _RE_VOLUME_MOYEN.search(pdf_text)
     if match:
         raw = match.group(1).strip()
-        indicators["volume_moyen_annuel"] = re.sub(r'\s+', '', raw).replace(',', '.')
+        indicators["volume_moyen_annuel"] = raw.translate(_NUM_TRANS)
         logging.info(f"   ✓ Volume Moyen Annuel trouvé: {indicators['volume_moyen_annuel']}")
     else:
         indicators["volume_moyen_annuel"] = None
         logging.warning("   ⚠️ Volume Moyen Annuel NON trouvé")
     
     # 🔧 FIX 6: VALEUR MOYENNE ANNUELLE (fonctionne déjà bien)
-    match = re.search(r"Valeur\s+moyenne\s+annuelle\s+par\s+séance\s+([\d\s,\.]+)", pdf_text, re.IGNORECASE)
+    match = _RE_VALEUR_MOYENNE.search(pdf_text)
     if match:
         raw = match.group(1).strip()
-        indicators["valeur_moyenne_annuelle"] = re.sub(r'\s+', '', raw).replace(',', '.')
+        indicators["valeur_moyenne_annuelle"] = raw.translate(_NUM_TRANS)
         logging.info(f"   ✓ Valeur Moyenne Annuelle trouvée: {indicators['valeur_moyenne_annuelle']}")
     else:
         indicators["valeur_moyenne_annuelle"] = None
@@ -275,29 +478,91 @@ def extract_market_indicators(pdf_text: str) -> dict:
     return indicators
 
 
-def insert_into_db(conn, company_ids, symbol, trade_date, price, volume, value):
-    """Insertion historical_data"""
-    if symbol not in company_ids:
-        return False
-    
-    company_id = company_ids[symbol]
-    
+def insert_rows_one_by_one(conn, records):
+    """
+    Insertion historical_data ligne par ligne (repli du chargement groupé) :
+    chaque ligne est isolée par un SAVEPOINT, une ligne invalide n'annule pas
+    les autres. La requête est préparée une seule fois côté serveur (PREPARE),
+    puis exécutée par ligne sans nouvelle analyse/planification ; les types
+    des paramètres sont déduits des colonnes cibles de historical_data.
+    PREPARE, EXECUTE et DEALLOCATE tiennent dans UNE transaction : derrière un
+    pooler en mode transaction (Supabase), chaque transaction peut changer de
+    backend et l'instruction préparée n'y existerait plus.
+    records : [(company_id, trade_date, price, volume, value)]
+    Retourne le nombre de lignes insérées.
+    """
+    inserted = 0
     try:
         with conn.cursor() as cur:
-            cur.execute(
-                """
+            cur.execute("""
+                PREPARE hist_ins AS
                 INSERT INTO historical_data (company_id, trade_date, price, volume, value)
-                VALUES (%s, %s, %s, %s, %s)
+                VALUES ($1, $2, $3, $4, $5)
                 ON CONFLICT (company_id, trade_date) DO NOTHING;
-                """,
-                (company_id, trade_date, price, volume, value)
+            """)
+            
+            for record in records:
+                cur.execute("SAVEPOINT hist_row;")
+                try:
+                    cur.execute("EXECUTE hist_ins (%s, %s, %s, %s, %s);", record)
+                except Exception as e:
+                    logging.error(f"❌ Erreur insertion company_id={record[0]} ({record[1]}): {e}")
+                    cur.execute("ROLLBACK TO SAVEPOINT hist_row;")
+                    continue
+                if cur.rowcount > 0:
+                    inserted += 1
+                cur.execute("RELEASE SAVEPOINT hist_row;")
+            
+            cur.execute("DEALLOCATE hist_ins;")
+        conn.commit()
+        return inserted
+    except Exception as e:
+        logging.error(f"❌ Erreur insertion ligne par ligne: {e}")
+        conn.rollback()
+        return 0
+
+
+def insert_historical_batch(conn, records):
+    """
+    Chargement groupé historical_data : COPY vers une table temporaire,
+    puis un seul INSERT ... SELECT ... ON CONFLICT DO NOTHING.
+    records : [(company_id, trade_date, price, volume, value)]
+    Retourne le nombre de lignes insérées, ou None si le lot a été annulé.
+    """
+    if not records:
+        return 0
+    buf = StringIO()
+    csv.writer(buf).writerows(records)
+    buf.seek(0)
+    
+    try:
+        with conn.cursor() as cur:
+            # Chargement idempotent (ON CONFLICT DO NOTHING) : en cas de crash, les
+            # dernières transactions non flushées sont simplement rejouées au run suivant
+            cur.execute("SET LOCAL synchronous_commit = OFF;")
+            # Structure copiée de historical_data (types suivis en cas d'évolution du
+            # schéma) ; DEFAULTS requis pour les colonnes NOT NULL absentes du COPY (id)
+            cur.execute("""
+                CREATE TEMP TABLE hist_stage (LIKE historical_data INCLUDING DEFAULTS)
+                ON COMMIT DROP;
+            """)
+            # None → champ CSV vide non quoté → NULL
+            cur.copy_expert(
+                "COPY hist_stage (company_id, trade_date, price, volume, value) FROM STDIN WITH (FORMAT CSV)",
+                buf
             )
-            conn.commit()
-            return cur.rowcount > 0
+            cur.execute("""
+                INSERT INTO historical_data (company_id, trade_date, price, volume, value)
+                SELECT company_id, trade_date, price, volume, value FROM hist_stage
+                ON CONFLICT (company_id, trade_date) DO NOTHING;
+            """)
+            inserted = cur.rowcount
+        conn.commit()
+        return inserted
     except Exception as e:
-        logging.error(f"❌ Erreur insertion: {e}")
+        logging.error(f"❌ Erreur chargement groupé (COPY): {e}")
         conn.rollback()
-        return False
+        return None
 
 
 def insert_market_indicators_to_db(conn, indicators, trade_date):
@@ -374,6 +639,9 @@ def run_data_collection():
     try:
         with conn.cursor() as cur:
             company_ids = get_company_ids(cur)
+        # Envoyé aux processus d'analyse ; None (aucun filtre) si les IDs n'ont
+        # pu être lus, pour ne pas écarter toutes les lignes
+        company_symbols = frozenset(company_ids) or None
         
         boc_links = get_all_boc_links()
         if not boc_links:
@@ -382,7 +650,10 @@ def run_data_collection():
         
         total_db_inserts = 0
         total_skipped = 0
+        all_records = []   # lignes nettoyées de tous les BOC, chargées en une fois
         
+        # Sélection des BOC à traiter (dates absentes de la DB)
+        candidates = []
         for boc_url in boc_links:
             date_str = extract_date_from_url(boc_url)
             if not date_str:
@@ -393,57 +664,109 @@ def run_data_collection():
             except ValueError:
                 continue
             
-            logging.info(f"\n📅 Traitement du BOC du {trade_date.strftime('%d/%m/%Y')}")
-            
-            if date_exists_in_db(conn, trade_date):
-                logging.info("   ✓ Date déjà présente dans DB")
+            candidates.append((boc_url, trade_date))
+        
+        existing_dates = (
+            get_existing_dates(conn, {d for _, d in candidates}) if candidates else set()
+        )
+        pending = []
+        for boc_url, trade_date in candidates:
+            if trade_date in existing_dates:
+                logging.info(f"📅 BOC du {trade_date.strftime('%d/%m/%Y')} : date déjà présente dans DB")
                 total_skipped += 1
                 continue
-            
-            logging.info("   ℹ️ Extraction des données du PDF...")
-            rows = extract_data_from_pdf(boc_url)
-            
-            if not rows:
-                logging.warning(f"   ⚠️ Aucune donnée extraite")
-                continue
-            
-            # Extraction texte pour indicateurs
-            pdf_bytes = requests.get(boc_url, verify=False, timeout=30).content
-            try:
-                pdf_text = ""
-                with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
-                    for page in pdf.pages:
-                        pdf_text += page.extract_text() or ""
-            except Exception as e:
-                logging.warning(f"⚠️ Impossible d'extraire le texte : {e}")
-                pdf_text = ""
-            
-            # ✅ Insertion indicateurs (6 variables seulement)
-            logging.info("   🔍 Extraction des indicateurs de marché...")
-            indicators = extract_market_indicators(pdf_text)
-            insert_market_indicators_to_db(conn, indicators, trade_date)
-            
-            # Insertion historical_data
-            db_inserts = 0
-            for rec in rows:
-                symbol = rec.get("Symbole", "").strip()
-                if symbol not in company_ids:
-                    continue
-                
-                try:
-                    price = clean_and_convert_numeric(rec.get("Cours"))
-                    volume = int(clean_and_convert_numeric(rec.get("Volume")) or 0)
-                    value = clean_and_convert_numeric(rec.get("Valeur"))
+            pending.append((boc_url, trade_date))
+        
+        logging.info(f"ℹ️ {len(pending)} BOC(s) à télécharger ({PDF_WORKERS} en parallèle)")
+        pdf_engine = "PyMuPDF" if PYMUPDF_OK and PDF_ENGINE != "pdfplumber" else "pdfplumber"
+        logging.info(f"ℹ️ Moteur d'extraction PDF : {pdf_engine}")
+        
+        # Étape 1 (réseau) : téléchargements en parallèle sur le pool de connexions
+        # Étape 2 (CPU) : chaque PDF part vers un processus d'analyse dès la fin de
+        #                 SON téléchargement, sans attendre les précédents
+        # Étape 3 (DB) : insertions dans le processus principal au fil des analyses,
+        #                pendant que les téléchargements restants se poursuivent
+        # Une seule boucle wait(FIRST_COMPLETED) sert les deux ensembles de futures.
+        # Processus d'analyse lancés en "spawn" : un fork alors que les threads de
+        # téléchargement tournent peut hériter d'un verrou tenu et se bloquer.
+        # Les PDF transitent par un répertoire temporaire supprimé en fin de collecte
+        try:
+            with tempfile.TemporaryDirectory(prefix="boc_") as tmp_dir, \
+                 ThreadPoolExecutor(max_workers=PDF_WORKERS) as downloader, \
+                 ProcessPoolExecutor(max_workers=PARSE_WORKERS,
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_parse_worker,
+                                     initargs=(logging.getLogger().getEffectiveLevel(),)) as parser:
+                # future en cours → (étape, date du BOC)
+                in_flight = {
+                    downloader.submit(download_pdf, boc_url, tmp_dir): ("download", trade_date)
+                    for boc_url, trade_date in pending
+                }
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        stage, trade_date = in_flight.pop(future)
+                        
+                        if stage == "download":
+                            pdf_path = future.result()
+                            if pdf_path:
+                                try:
+                                    in_flight[parser.submit(parse_pdf_file, pdf_path, company_symbols)] = ("parse", trade_date)
+                                except Exception as e:
+                                    # Pool cassé par un processus d'analyse mort (BrokenProcessPool)
+                                    logging.error(f"❌ BOC du {trade_date.strftime('%d/%m/%Y')} : analyse impossible: {e}")
+                            else:
+                                logging.warning(f"⚠️ BOC du {trade_date.strftime('%d/%m/%Y')} : téléchargement échoué")
+                            continue
+                        
+                        logging.info(f"\n📅 Traitement du BOC du {trade_date.strftime('%d/%m/%Y')}")
+                        try:
+                            rows, pdf_text = future.result()
+                        except Exception as e:
+                            # Processus d'analyse mort (ex. plantage de MuPDF sur un BOC
+                            # corrompu) : ce BOC est abandonné, les autres sont conservés
+                            logging.error(f"   ❌ Analyse du BOC échouée: {e}")
+                            continue
                     
-                    if insert_into_db(conn, company_ids, symbol, trade_date, price, volume, value):
-                        db_inserts += 1
-                except Exception as e:
-                    logging.error(f"   ❌ Erreur traitement {symbol}: {e}")
-                    continue
-            
-            total_db_inserts += db_inserts
-            logging.info(f"   ✅ DB: {db_inserts} inserts")
-            time.sleep(0.5)
+                        # ✅ Insertion indicateurs (6 variables seulement), indépendante des
+                        # lignes retenues ; texte déjà lu lors de l'extraction
+                        if pdf_text:
+                            logging.info("   🔍 Extraction des indicateurs de marché...")
+                            indicators = extract_market_indicators(pdf_text)
+                            insert_market_indicators_to_db(conn, indicators, trade_date)
+                    
+                        if not rows:
+                            logging.warning(f"   ⚠️ Aucune donnée extraite")
+                            continue
+                    
+                        # historical_data : nettoyage ici, chargement groupé après la boucle
+                        records = []
+                        get_company_id = company_ids.get
+                        for symbol, cours, vol, val in rows:
+                            company_id = get_company_id(symbol)
+                            if company_id is None:
+                                continue
+                        
+                            try:
+                                price = clean_and_convert_numeric(cours)
+                                volume = int(clean_and_convert_numeric(vol) or 0)
+                                value = clean_and_convert_numeric(val)
+                            except Exception as e:
+                                logging.error(f"   ❌ Erreur traitement {symbol}: {e}")
+                                continue
+                            records.append((company_id, trade_date, price, volume, value))
+                    
+                        all_records.extend(records)
+                        logging.info(f"   ✅ {len(records)} ligne(s) prête(s) pour historical_data")
+        finally:
+            # Chargement des lignes déjà collectées, même si la collecte est
+            # interrompue en cours de route (pas de perte du travail des autres BOC)
+            if all_records:
+                logging.info(f"\n💾 Chargement groupé de {len(all_records)} ligne(s) dans historical_data...")
+                total_db_inserts = insert_historical_batch(conn, all_records)
+                if total_db_inserts is None:
+                    # Repli ligne par ligne : une ligne invalide n'annule pas tout le lot
+                    total_db_inserts = insert_rows_one_by_one(conn, all_records)
         
         logging.info("\n" + "=" * 60)
         logging.info("✅ COLLECTE TERMINÉE")
@@ -469,4 +792,5 @@ class BRVMDataCollector:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s: %(message)s")
     run_data_collection()
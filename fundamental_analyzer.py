@@ -15,11 +15,9 @@ import urllib3
 from collections import defaultdict
 import psycopg2
 import pypdf
-import io
-import json
+import tempfile
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
 
 # --- Configuration & Secrets ---
 DB_NAME = os.environ.get('DB_NAME')
@@ -229,7 +227,7 @@ class BRVMAnalyzer:
                     error_count += 1
                     continue
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = BeautifulSoup(response.content, 'lxml')
                 
                 # Recherche des liens PDF
                 pdf_links = []
@@ -328,50 +326,55 @@ class BRVMAnalyzer:
         """Extrait le texte d'un PDF — utilise pypdf (successeur de PyPDF2)"""
         try:
             logging.info(f"      📥 Téléchargement PDF: {pdf_url[:80]}...")
-            response = self.session.get(pdf_url, timeout=30, verify=False)
-            
-            if response.status_code != 200:
-                logging.warning(f"      ⚠️ HTTP {response.status_code} pour le PDF")
-                return None
-            
-            content_type = response.headers.get('Content-Type', '')
-            if 'html' in content_type.lower():
-                logging.warning(f"      ⚠️ Le serveur a renvoyé du HTML au lieu d'un PDF (redirection login?)")
-                return None
-            
-            pdf_file = io.BytesIO(response.content)
-            logging.info(f"      📦 PDF téléchargé: {len(response.content)/1024:.0f} Ko")
-            
-            text = ""
-            # ✅ Fix: utiliser pypdf (pas PyPDF2), sans context manager (API de base)
-            try:
-                reader = pypdf.PdfReader(pdf_file)
-                nb_pages = len(reader.pages)
-                logging.info(f"      📄 {nb_pages} page(s) détectée(s)")
+            # ✅ Téléchargement en flux vers un fichier temporaire (RAM jusqu'à 8 Mo,
+            # disque au-delà), fermé (et supprimé) en sortie sur tous les chemins
+            with tempfile.SpooledTemporaryFile(max_size=8 << 20) as pdf_file:
+                with self.session.get(pdf_url, timeout=30, verify=False, stream=True) as response:
+                    if response.status_code != 200:
+                        logging.warning(f"      ⚠️ HTTP {response.status_code} pour le PDF")
+                        return None
+                    
+                    content_type = response.headers.get('Content-Type', '')
+                    if 'html' in content_type.lower():
+                        logging.warning(f"      ⚠️ Le serveur a renvoyé du HTML au lieu d'un PDF (redirection login?)")
+                        return None
+                    
+                    for chunk in response.iter_content(chunk_size=1 << 16):
+                        pdf_file.write(chunk)
                 
-                for page_num, page in enumerate(reader.pages, 1):
-                    try:
-                        page_text = page.extract_text() or ""
-                        text += page_text + "\n"
-                        if page_num % 10 == 0:
-                            logging.info(f"      📄 Page {page_num}/{nb_pages} traitée...")
-                    except Exception as e:
-                        logging.warning(f"      ⚠️ Page {page_num} illisible: {e}")
-                        continue
-                        
-            except Exception as e:
-                logging.warning(f"      ⚠️ Erreur lecture PDF avec pypdf: {e}")
-                # Tentative de fallback avec pdfplumber
+                logging.info(f"      📦 PDF téléchargé: {pdf_file.tell()/1024:.0f} Ko")
+                pdf_file.seek(0)
+                
+                text = ""
+                # ✅ Fix: utiliser pypdf (pas PyPDF2), sans context manager (API de base)
                 try:
-                    import pdfplumber
-                    pdf_file.seek(0)
-                    with pdfplumber.open(pdf_file) as pdf:
-                        for page in pdf.pages:
-                            text += (page.extract_text() or "") + "\n"
-                    logging.info(f"      ✅ Fallback pdfplumber réussi")
-                except Exception as e2:
-                    logging.error(f"      ❌ Fallback pdfplumber aussi échoué: {e2}")
-                    return None
+                    reader = pypdf.PdfReader(pdf_file)
+                    nb_pages = len(reader.pages)
+                    logging.info(f"      📄 {nb_pages} page(s) détectée(s)")
+                    
+                    for page_num, page in enumerate(reader.pages, 1):
+                        try:
+                            page_text = page.extract_text() or ""
+                            text += page_text + "\n"
+                            if page_num % 10 == 0:
+                                logging.info(f"      📄 Page {page_num}/{nb_pages} traitée...")
+                        except Exception as e:
+                            logging.warning(f"      ⚠️ Page {page_num} illisible: {e}")
+                            continue
+                            
+                except Exception as e:
+                    logging.warning(f"      ⚠️ Erreur lecture PDF avec pypdf: {e}")
+                    # Tentative de fallback avec pdfplumber
+                    try:
+                        import pdfplumber
+                        pdf_file.seek(0)
+                        with pdfplumber.open(pdf_file) as pdf:
+                            for page in pdf.pages:
+                                text += (page.extract_text() or "") + "\n"
+                        logging.info(f"      ✅ Fallback pdfplumber réussi")
+                    except Exception as e2:
+                        logging.error(f"      ❌ Fallback pdfplumber aussi échoué: {e2}")
+                        return None
             
             if not text.strip():
                 logging.warning(f"      ⚠️ PDF extrait mais vide (PDF scanné/image?)")
@@ -379,7 +382,8 @@ class BRVMAnalyzer:
             
             # Nettoyage
             text = re.sub(r'\s+', ' ', text).strip()
-            text = unicodedata.normalize('NFKD', text)
+            if not text.isascii():   # NFKD est l'identité sur l'ASCII pur
+                text = unicodedata.normalize('NFKD', text)
             
             # Limiter à 50000 caractères pour les API
             if len(text) > 50000:
@@ -815,5 +819,6 @@ IMPORTANT:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
     analyzer = BRVMAnalyzer()
     analyzer.run_and_get_results()
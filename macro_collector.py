@@ -23,16 +23,12 @@ import os
 import sys
 import traceback
 import hashlib
+import itertools
 import psycopg2
 import psycopg2.extras
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
-
 # ==============================================================================
 # SOURCES RSS (tentative 1 — peut échouer sur certains runners)
 # ==============================================================================
@@ -123,6 +119,38 @@ MISTRAL_SEARCH_QUERIES = [
     ("commerce mondial protectionnisme G7 G20 accords",                               "international", "politique",          "politique"),
 ]
 
+# Espacement minimal entre deux appels Mistral web_search (politesse API).
+# La durée de la requête elle-même compte dans cet intervalle.
+MISTRAL_MIN_INTERVAL = 1.5   # secondes
+MISTRAL_429_PAUSE    = 30    # secondes
+MISTRAL_ERROR_PAUSE  = 2     # secondes
+
+
+class CallPacer:
+    """
+    Espacement minimal entre deux appels à une même API.
+
+    Seau à jetons de capacité 1 sur une échéance time.monotonic() : on ne
+    dort que le temps restant jusqu'à l'échéance, le temps passé dans la
+    requête précédente (ou ailleurs) est donc déjà décompté.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = 0.0   # time.monotonic() du prochain appel autorisé
+
+    def wait(self):
+        """Attend le prochain créneau puis réserve le suivant."""
+        now = time.monotonic()
+        if now < self._next_slot:
+            time.sleep(self._next_slot - now)
+            now = self._next_slot
+        self._next_slot = now + self.min_interval
+
+    def defer(self, delay: float):
+        """Repousse le prochain créneau d'au moins `delay` secondes."""
+        self._next_slot = max(self._next_slot, time.monotonic() + delay)
+
 # ==============================================================================
 # MOTS-CLÉS DE PERTINENCE
 # ==============================================================================
@@ -157,14 +185,19 @@ class MacroCollector:
       3. Enrichissement IA des articles bruts (résumé, impact BRVM, sentiment)
     """
 
-    def __init__(self, db_conn, gemini_keys: list, deepseek_key: str,
+    def __init__(self, db_conn, gemini_keys: tuple, deepseek_key: str,
                  mistral_key: str, max_articles_per_source: int = 10):
         self.db_conn       = db_conn
-        self.gemini_keys   = gemini_keys if isinstance(gemini_keys, list) else ([gemini_keys] if gemini_keys else [])
+        # Figées en tuple : la liste des clés ne change plus après l'initialisation
+        if isinstance(gemini_keys, (list, tuple)):
+            self.gemini_keys = tuple(gemini_keys)
+        else:
+            self.gemini_keys = (gemini_keys,) if gemini_keys else ()
         self.deepseek_key  = deepseek_key
         self.mistral_key   = mistral_key
         self.max_per_src   = max_articles_per_source
-        self._gemini_idx   = 0
+        self._gemini_cycle = itertools.cycle(self.gemini_keys)
+        self._mistral_pacer = CallPacer(MISTRAL_MIN_INTERVAL)
         self.stats = {"fetched": 0, "inserted": 0, "skipped": 0, "errors": 0}
 
     # ──────────────────────────────────────────────────────────────────────────
@@ -363,6 +396,7 @@ class MacroCollector:
         if not feed.entries:
             feed = feedparser.parse(source["url"])
 
+        now = datetime.now(timezone.utc)   # une seule lecture d'horloge par flux
         articles = []
         for entry in feed.entries[:self.max_per_src]:
             pub_date = None
@@ -394,7 +428,7 @@ class MacroCollector:
             score    = self._score_article(titre + ' ' + resume, source)
 
             articles.append({
-                "mail_date":      pub_date or datetime.now(timezone.utc),
+                "mail_date":      pub_date or now,
                 "mail_subject":   titre,
                 "titre":          titre,
                 "resume":         resume,
@@ -487,6 +521,7 @@ Si aucune actualité récente n'est trouvée, retourne {{"articles": []}}."""
                     }]
                 }
 
+                self._mistral_pacer.wait()
                 resp = requests.post(
                     "https://api.mistral.ai/v1/chat/completions",
                     headers=headers, json=body, timeout=45
@@ -509,17 +544,16 @@ Si aucune actualité récente n'est trouvée, retourne {{"articles": []}}."""
                             # Fallback : essai sans tools (prompt pur)
                             parsed = self._collect_mistral_simple(headers, prompt, zone, categorie, type_actualite)
                             all_articles.extend(parsed)
-                    time.sleep(1.5)  # politesse API
 
                 elif resp.status_code == 429:
-                    logging.warning("   ⏳ Mistral rate limit — pause 30s")
-                    time.sleep(30)
+                    logging.warning(f"   ⏳ Mistral rate limit — pause {MISTRAL_429_PAUSE}s")
+                    self._mistral_pacer.defer(MISTRAL_429_PAUSE)
                 else:
                     logging.warning(f"   ⚠️  Mistral HTTP {resp.status_code} pour '{query[:40]}'")
                     # Fallback sans tools
                     parsed = self._collect_mistral_simple(headers, prompt, zone, categorie, type_actualite)
                     all_articles.extend(parsed)
-                    time.sleep(2)
+                    self._mistral_pacer.defer(MISTRAL_ERROR_PAUSE)
 
             except Exception as e:
                 logging.warning(f"   ⚠️  Mistral web_search '{query[:40]}': {e}")
@@ -564,6 +598,7 @@ Si aucune actualité récente n'est trouvée, retourne {{"articles": []}}."""
             if not raw_articles:
                 return []
 
+            now = datetime.now(timezone.utc)   # date par défaut commune au lot
             result = []
             for art in raw_articles:
                 titre  = str(art.get("titre", "")).strip()
@@ -576,7 +611,7 @@ Si aucune actualité récente n'est trouvée, retourne {{"articles": []}}."""
                 try:
                     pub_date = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
                 except Exception:
-                    pub_date = datetime.now(timezone.utc)
+                    pub_date = now
 
                 url_hash = hashlib.md5((titre + date_str).encode()).hexdigest()
                 source   = str(art.get("source", f"Mistral/{zone}"))
@@ -745,8 +780,7 @@ Réponds UNIQUEMENT en JSON valide :
     def _call_gemini(self, prompt: str) -> Optional[str]:
         if not self.gemini_keys:
             return None
-        key = self.gemini_keys[self._gemini_idx % len(self.gemini_keys)]
-        self._gemini_idx += 1
+        key = next(self._gemini_cycle)
         url  = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent?key={key}"
         data = {"contents": [{"parts": [{"text": prompt}]}],
                 "generationConfig": {"temperature": 0.2, "maxOutputTokens": 600}}
@@ -844,6 +878,15 @@ Réponds UNIQUEMENT en JSON valide :
 # POINT D'ENTRÉE STANDALONE (GitHub Actions)
 # ==============================================================================
 
+# Variables d'environnement lues pour la rotation des clés Gemini
+GEMINI_KEY_ENV_VARS = ("GEMINI_API_KEY", "GEMINI_API_KEY_2", "GEMINI_API_KEY_3")
+
+
+def load_gemini_keys() -> tuple:
+    """Retourne les clés Gemini définies dans l'environnement (ordre de rotation)."""
+    return tuple(k for k in (os.environ.get(var) for var in GEMINI_KEY_ENV_VARS) if k)
+
+
 def _get_db_connection():
     required = ["DB_NAME", "DB_USER", "DB_PASSWORD", "DB_HOST"]
     missing  = [v for v in required if not os.environ.get(v)]
@@ -861,13 +904,10 @@ def _get_db_connection():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     logging.info("🌍 MACRO COLLECTOR v3 — Exécution standalone")
 
-    gemini_keys = [k for k in [
-        os.environ.get("GEMINI_API_KEY"),
-        os.environ.get("GEMINI_API_KEY_2"),
-        os.environ.get("GEMINI_API_KEY_3"),
-    ] if k]
+    gemini_keys = load_gemini_keys()
     deepseek_key = os.environ.get("DEEPSEEK_API_KEY")
     mistral_key  = os.environ.get("MISTRAL_API_KEY")
 
@@ -28,14 +28,9 @@ import time
 import traceback
 import psycopg2
 
-from data_collector       import BRVMDataCollector
-from technical_analyzer   import TechnicalAnalyzer
-from prediction_analyzer  import PredictionAnalyzer
-from fundamental_analyzer import BRVMAnalyzer
-from report_generator     import BRVMReportGenerator
-from macro_collector      import MacroCollector
-
 # ── Configuration du logging ──────────────────────────────────────────────────
+# Seule configuration globale : les modules importés ci-dessous ne configurent
+# le logging que lorsqu'ils sont exécutés seuls (bloc __main__).
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(levelname)s: %(message)s',
@@ -44,6 +39,13 @@ logging.basicConfig(
     ]
 )
 
+from data_collector       import BRVMDataCollector
+from technical_analyzer   import TechnicalAnalyzer
+from prediction_analyzer  import PredictionAnalyzer
+from fundamental_analyzer import BRVMAnalyzer
+from report_generator     import BRVMReportGenerator
+from macro_collector      import MacroCollector, load_gemini_keys
+
 # ── Lecture des credentials depuis l'environnement ───────────────────────────
 DB_NAME      = os.environ.get("DB_NAME")
 DB_USER      = os.environ.get("DB_USER")
@@ -54,15 +56,8 @@ DB_PORT      = os.environ.get("DB_PORT", "5432")
 DEEPSEEK_API_KEY = os.environ.get("DEEPSEEK_API_KEY")
 MISTRAL_API_KEY  = os.environ.get("MISTRAL_API_KEY")
 
-# Support de plusieurs clés Gemini pour la rotation
-GEMINI_API_KEYS = [
-    k for k in [
-        os.environ.get("GEMINI_API_KEY"),
-        os.environ.get("GEMINI_API_KEY_2"),
-        os.environ.get("GEMINI_API_KEY_3"),
-    ]
-    if k
-]
+# Support de plusieurs clés Gemini pour la rotation (tuple lu une seule fois)
+GEMINI_API_KEYS = load_gemini_keys()
 
 
 # ==============================================================================
@@ -118,7 +113,7 @@ def main():
     En cas d'échec d'une étape critique (Collecte données, Rapport), on lève.
     """
 
-    start_time = time.time()
+    start_time = time.monotonic()
 
     logging.info("=" * 70)
     logging.info("🚀  BRVM ANALYSIS SUITE — DÉMARRAGE")
@@ -249,7 +244,7 @@ def main():
     # ──────────────────────────────────────────────────────────────────────────
     # RÉSUMÉ FINAL
     # ──────────────────────────────────────────────────────────────────────────
-    elapsed = time.time() - start_time
+    elapsed = time.monotonic() - start_time
     minutes = int(elapsed // 60)
     seconds = int(elapsed % 60)
 
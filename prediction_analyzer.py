@@ -55,11 +55,6 @@ from tensorflow.keras.layers import (
 )
 from tensorflow.keras.optimizers import Adam
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s: %(message)s",
-)
-
 # ---------------------------------------------------------------------------
 # Variables d'environnement — connexion PostgreSQL
 # ---------------------------------------------------------------------------
@@ -318,12 +313,15 @@ MODELS_PARAMS = {
 
 def _resolve_paths(symbol: str):
     action_dir = os.path.join(MODELS_DIR, symbol)
-    if not os.path.isdir(action_dir):
+    # Un seul listdir : il sert à la fois de test d'existence du dossier
+    # et de test de présence du scaler (pas de stat() supplémentaire)
+    try:
+        all_files = os.listdir(action_dir)
+    except (FileNotFoundError, NotADirectoryError):
         logging.warning(f"⚠️  {symbol} : dossier absent ({action_dir})")
         return None, None
 
     source      = MODELS_PARAMS.get(symbol, {}).get("source", "base")
-    all_files   = os.listdir(action_dir)
     keras_files = [f for f in all_files if f.endswith(".keras")]
 
     if not keras_files:
@@ -338,13 +336,11 @@ def _resolve_paths(symbol: str):
     keras_file  = sorted(candidates)[0] if candidates else sorted(keras_files)[0]
     keras_path  = os.path.join(action_dir, keras_file)
     scaler_name = "scaler_advanced.pkl" if source == "advanced" else "scaler.pkl"
-    scaler_path = os.path.join(action_dir, scaler_name)
-
-    if not os.path.exists(scaler_path):
+    if scaler_name not in all_files:
         logging.warning(f"⚠️  {symbol} : {scaler_name} absent dans {action_dir}")
         return None, None
 
-    return keras_path, scaler_path
+    return keras_path, os.path.join(action_dir, scaler_name)
 
 
 # ==============================================================================
@@ -911,4 +907,5 @@ class PredictionAnalyzer:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s: %(message)s")
     run_prediction_analysis()
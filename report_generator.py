@@ -18,20 +18,17 @@ import time
 import json
 from collections import defaultdict, Counter
 import io
-import base64
+from macro_collector import CallPacer
 try:
     import matplotlib
     matplotlib.use('Agg')          # backend non-interactif, safe en CI/GitHub Actions
     import matplotlib.pyplot as plt
     import matplotlib.dates as mdates
-    from matplotlib.gridspec import GridSpec
     MATPLOTLIB_OK = True
 except ImportError:
     MATPLOTLIB_OK = False
     logging.warning("⚠️  matplotlib non disponible — graphiques désactivés")
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
-
 # --- Configuration & Secrets ---
 DB_NAME = os.environ.get('DB_NAME')
 DB_USER = os.environ.get('DB_USER')
@@ -51,19 +48,23 @@ GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini
 MISTRAL_API_KEY = os.environ.get('MISTRAL_API_KEY')
 MISTRAL_MODEL = "mistral-large-latest"
 MISTRAL_API_URL = "https://api.mistral.ai/v1/chat/completions"
+MISTRAL_MIN_INTERVAL = 1.0   # secondes entre deux appels Mistral (free tier)
 
 # Claude (Anthropic) — fallback final si toutes les autres IA échouent
 ANTHROPIC_API_KEY = os.environ.get('ANTHROPIC_API_KEY')
 ANTHROPIC_MODEL = "claude-haiku-4-5-20251001"   # modèle rapide et économique
 ANTHROPIC_API_URL = "https://api.anthropic.com/v1/messages"
 ANTHROPIC_API_VERSION = "2023-06-01"
+CLAUDE_MIN_INTERVAL = 60 / 50   # secondes entre deux appels Claude (50 req/min)
 
 
 class BRVMReportGenerator:
     def __init__(self):
         self.db_conn = None
-        self.request_count = {'deepseek': 0, 'gemini': 0, 'mistral': 0, 'claude': 0, 'total': 0}
+        self.request_count = {'deepseek': 0, 'gemini': 0, 'mistral': 0, 'claude': 0}
         self.all_recommendations = {}
+        self._mistral_pacer = CallPacer(MISTRAL_MIN_INTERVAL)
+        self._claude_pacer = CallPacer(CLAUDE_MIN_INTERVAL)
         
         try:
             self.db_conn = psycopg2.connect(
@@ -2060,7 +2061,6 @@ RÈGLES IMPÉRATIVES :
                 if 'choices' in result and len(result['choices']) > 0:
                     text = result['choices'][0]['message']['content']
                     self.request_count['deepseek'] += 1
-                    self.request_count['total'] += 1
                     return text, "deepseek"
             
             return None, None
@@ -2094,7 +2094,6 @@ RÈGLES IMPÉRATIVES :
                 if 'candidates' in result and len(result['candidates']) > 0:
                     text = result['candidates'][0]['content']['parts'][0]['text']
                     self.request_count['gemini'] += 1
-                    self.request_count['total'] += 1
                     return text, "gemini"
             
             return None, None
@@ -2125,6 +2124,7 @@ RÈGLES IMPÉRATIVES :
 
         for _attempt in range(3):
             try:
+                self._mistral_pacer.wait()
                 response = requests.post(
                     MISTRAL_API_URL, headers=headers,
                     json=request_body, timeout=60
@@ -2135,13 +2135,12 @@ RÈGLES IMPÉRATIVES :
                     if 'choices' in data and len(data['choices']) > 0:
                         text = data['choices'][0]['message']['content']
                         self.request_count['mistral'] += 1
-                        self.request_count['total'] += 1
                         return text, "mistral"
                     return None, None
 
                 elif response.status_code == 429:
                     # Rate limit — attendre selon Retry-After ou délai exponentiel
-                    retry_after = int(response.headers.get('Retry-After', 10 * (2 ** _attempt)))
+                    retry_after = self._retry_after(response, 10 * (2 ** _attempt))
                     logging.warning(
                         f"    ⏳ Mistral rate limit (429) pour {symbol} — "
                         f"attente {retry_after}s (tentative {_attempt+1}/3)"
@@ -2172,6 +2171,17 @@ RÈGLES IMPÉRATIVES :
 
         return None, None
 
+    @staticmethod
+    def _retry_after(response, default):
+        """
+        Délai d'attente (s) demandé par un 429, borné à 0.
+        Retry-After absent ou non numérique (date HTTP) → délai par défaut.
+        """
+        try:
+            return max(0.0, float(response.headers.get('Retry-After', default)))
+        except (TypeError, ValueError):
+            return float(default)
+
     def _generate_analysis_with_claude(self, symbol, data_dict, prompt):
         """
         Génération d'analyse avec Claude (Anthropic) — fallback final.
@@ -2195,6 +2205,7 @@ RÈGLES IMPÉRATIVES :
 
         for _attempt in range(3):
             try:
+                self._claude_pacer.wait()
                 response = requests.post(
                     ANTHROPIC_API_URL,
                     headers=headers,
@@ -2213,13 +2224,12 @@ RÈGLES IMPÉRATIVES :
                     ).strip()
                     if text:
                         self.request_count["claude"] += 1
-                        self.request_count["total"]  += 1
                         logging.info(f"    ✅ {symbol}: Analyse générée via CLAUDE")
                         return text, "claude"
                     return None, None
 
                 elif response.status_code == 429:
-                    retry_after = int(response.headers.get("Retry-After", 15 * (2 ** _attempt)))
+                    retry_after = self._retry_after(response, 15 * (2 ** _attempt))
                     logging.warning(
                         f"    ⏳ Claude rate limit (429) pour {symbol} — "
                         f"attente {retry_after}s (tentative {_attempt+1}/3)"
@@ -3785,7 +3795,6 @@ RAPPELS IMPÉRATIFS:
                 date_fin        = df_hist.iloc[-1]['extraction_date']
                 
                 # ── Stats descriptives BRVM Composite ──────────────────
-                import numpy as np
                 from scipy import stats as _sc
                 comp_vals = df_hist['brvm_composite'].dropna().astype(float)
                 c_mean   = float(comp_vals.mean())   if len(comp_vals) > 0 else 0
@@ -8241,9 +8250,6 @@ RAPPELS IMPÉRATIFS:
             elif 'vente' in _al_pre: _fd_pre = 'VENTE'
             else:                    _fd_pre = 'NEUTRE'
 
-            # Délai entre sociétés pour éviter le rate limit Mistral free tier
-            time.sleep(1)
-
             recommendation, rec_score = self._extract_recommendation_from_analysis(
                 analysis, tech_decision=_td_pre, fund_decision=_fd_pre
             )
@@ -8344,7 +8350,7 @@ RAPPELS IMPÉRATIFS:
         logging.info(f"   - Gemini: {self.request_count['gemini']}")
         logging.info(f"   - Mistral: {self.request_count['mistral']}")
         logging.info(f"   - Claude:  {self.request_count['claude']}")
-        logging.info(f"   - TOTAL: {self.request_count['total']}")
+        logging.info(f"   - TOTAL: {sum(self.request_count.values())}")
         logging.info(f"\n📋 Analyses incluses:")
         logging.info(f"   ✅ Analyse par secteur")
         logging.info(f"   ✅ Matrice de convergence des signaux")
@@ -8358,6 +8364,7 @@ RAPPELS IMPÉRATIFS:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
     import sys
     try:
         report_generator = BRVMReportGenerator()
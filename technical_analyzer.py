@@ -7,19 +7,12 @@ import os
 import sys
 import logging
 import time
-from datetime import datetime, timedelta
 
 import pandas as pd
 import numpy as np
 import psycopg2
 from psycopg2.extras import execute_batch
 
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s: %(message)s'
-)
-
 # Configuration de la connexion PostgreSQL
 DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
@@ -90,7 +83,7 @@ def analyze_company_optimized(conn, company_id, symbol):
     Temps: ~15-20 secondes par société (au lieu de 5 minutes)
     """
     cursor = conn.cursor()
-    start_time = time.time()
+    start_time = time.monotonic()
     
     try:
         # ✅ OPTIMISATION 1: Une seule requête avec TOUTES les données nécessaires
@@ -266,7 +259,7 @@ def analyze_company_optimized(conn, company_id, symbol):
         execute_batch(cursor, insert_query, values, page_size=100)
         conn.commit()
         
-        elapsed = time.time() - start_time
+        elapsed = time.monotonic() - start_time
         logging.info(f"   ✅ {symbol}: {len(values)} enregistrements en {elapsed:.1f}s")
         
     except Exception as e:
@@ -291,7 +284,7 @@ def run_technical_analysis():
         
         logging.info(f"📊 {len(companies)} société(s) à analyser\n")
         
-        total_start = time.time()
+        total_start = time.monotonic()
         success_count = 0
         error_count = 0
         
@@ -305,7 +298,7 @@ def run_technical_analysis():
                 error_count += 1
                 continue
         
-        total_elapsed = time.time() - total_start
+        total_elapsed = time.monotonic() - total_start
         
         logging.info("\n" + "=" * 80)
         logging.info("✅ ANALYSE TECHNIQUE TERMINÉE")
@@ -324,4 +317,5 @@ def run_technical_analysis():
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s')
     run_technical_analysis()